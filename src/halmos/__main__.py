@@ -10,22 +10,24 @@ import signal
 import subprocess
 import sys
 import threading
-import time
 import traceback
-from collections import Counter
 from collections.abc import Iterable, Iterator
-from concurrent.futures import Future
-from dataclasses import asdict, dataclass
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass, fields, is_dataclass
 from datetime import timedelta
 from enum import Enum
 from importlib import metadata
+from operator import countOf
 
 import rich
 from z3 import (
     BitVec,
+    Solver,
     ZeroExt,
     eq,
+    sat,
     set_option,
+    unknown,
     unsat,
 )
 
@@ -40,7 +42,6 @@ from .build import (
 )
 from .bytevec import ByteVec
 from .calldata import FunctionInfo, get_abi, mk_calldata
-from .cheatcodes import snapshot_state
 from .config import Config as HalmosConfig
 from .config import arg_parser, default_config, resolve_config_files, toml_parser
 from .constants import (
@@ -98,6 +99,7 @@ from .traces import render_trace, rendered_call_sequence, rendered_trace
 from .utils import (
     EVM,
     Address,
+    BitVecSort160,
     BitVecSort256,
     NamedTimer,
     address,
@@ -219,17 +221,41 @@ def mk_block() -> Block:
 
 
 def mk_addr(name: str) -> Address:
-    return BitVec(name, 160)
+    return BitVec(name, BitVecSort160)
 
 
 def mk_solver(args: HalmosConfig, logic="QF_AUFBV", ctx=None):
-    return create_solver(
+    solver = create_solver(
         logic=logic,
         ctx=ctx,
         timeout=args.solver_timeout_branching,
         max_memory=args.solver_max_memory,
     )
 
+    # open a base scope, so that reset() can roll back to it instead of calling solver.reset()
+    solver.push()
+
+    return solver
+
+
+def acquire_solver(ctx: ContractContext, args: HalmosConfig) -> Solver:
+    """
+    Returns an empty solver for the given config, reusing a released one if available.
+
+    The solver must be returned with release_solver() once the path is fully explored.
+    """
+    pool = ctx.solver_pool.get((args.solver_timeout_branching, args.solver_max_memory))
+    return pool.pop() if pool else mk_solver(args)
+
+
+def release_solver(ctx: ContractContext, args: HalmosConfig, solver: Solver) -> None:
+    reset(solver)
+
+    key = (args.solver_timeout_branching, args.solver_max_memory)
+    pool = ctx.solver_pool.setdefault(key, [])
+    if len(pool) < args.solver_threads:
+        pool.append(solver)
+
 
 def deploy_test(ctx: FunctionContext, sevm: SEVM) -> Exec:
     message = Message(
@@ -331,8 +357,13 @@ def setup(ctx: FunctionContext) -> Exec:
     setup_exs_all = sevm.run(setup_ex)
     setup_exs_no_error: list[tuple[Exec, SMTQuery]] = []
 
+    trace_setup = args.verbose >= VERBOSITY_TRACE_SETUP
+    trace_setup_error = (
+        VERBOSITY_TRACE_COUNTEREXAMPLE <= args.verbose < VERBOSITY_TRACE_SETUP
+    )
+
     for path_id, setup_ex in enumerate(setup_exs_all):
-        if args.verbose >= VERBOSITY_TRACE_SETUP:
+        if trace_setup:
             print(f"{setup_sig} trace #{path_id}:")
             render_trace(setup_ex.context)
 
@@ -345,7 +376,7 @@ def setup(ctx: FunctionContext) -> Exec:
                 )
 
             # only render the trace if we didn't already do it
-            if VERBOSITY_TRACE_COUNTEREXAMPLE <= args.verbose < VERBOSITY_TRACE_SETUP:
+            if trace_setup_error:
                 print(f"{setup_sig} trace:")
                 render_trace(setup_ex.context)
 
@@ -362,6 +393,8 @@ def setup(ctx: FunctionContext) -> Exec:
         case [(ex, _)]:
             setup_exs.append(ex)
         case _:
+            # check the feasibility of all paths in parallel
+            future_to_ex: dict[Future, Exec] = {}
             for path_id, (ex, query) in enumerate(setup_exs_no_error):
                 path_ctx = PathContext(
                     args=args,
@@ -369,11 +402,21 @@ def setup(ctx: FunctionContext) -> Exec:
                     query=query,
                     solving_ctx=ctx.solving_ctx,
                 )
-                solver_output = solve_low_level(path_ctx)
-                if solver_output.result != unsat:
-                    setup_exs.append(ex)
-                    if len(setup_exs) > 1:
-                        break
+                future = ctx.thread_pool.submit(solve_low_level, path_ctx)
+                future_to_ex[future] = ex
+
+            try:
+                for future in as_completed(future_to_ex):
+                    solver_output = future.result()
+                    if solver_output.result != unsat:
+                        setup_exs.append(future_to_ex[future])
+                        if len(setup_exs) > 1:
+                            break
+            finally:
+                # no need to wait for the remaining checks if multiple paths are feasible
+                # (or if a check failed); cancel the pending ones and terminate the running solver processes
+                ctx.thread_pool.shutdown(wait=False, cancel_futures=True)
+                ctx.solving_ctx.executor.shutdown(wait=False)
 
     match len(setup_exs):
         case 0:
@@ -401,18 +444,58 @@ def setup(ctx: FunctionContext) -> Exec:
 
 
 def is_global_fail_set(context: CallContext) -> bool:
-    hevm_fail = isinstance(context.output.error, FailCheatcode)
-    return hevm_fail or any(is_global_fail_set(x) for x in context.subcalls())
+    # iterative dfs; the most recent subcalls are popped first
+    stack = [context]
+    while stack:
+        ctx = stack.pop()
+        if isinstance(ctx.output.error, FailCheatcode):
+            return True
+        stack.extend(ctx.subcalls())
+    return False
 
 
-def get_state_id(ex: Exec) -> bytes:
+def _quick_state_id(ex: Exec) -> int:
     """
-    Computes the state snapshot hash, incorporating constraints on state variables.
+    Computes a cheap discriminator of the state, which is implied by Exec.state_id.
+
+    States with different quick ids have different state ids, so the (more expensive) state id only needs to be computed when quick ids collide.
+    """
+    return hash(
+        (
+            ex.balance.get_id(),
+            len(ex.code),
+            tuple(len(storage) for storage in ex.storage.values()),
+            len(ex.path.sliced),
+        )
+    )
+
 
-    Assumes constraints on state variables have been precomputed by running Exec.path_slice() after completing a transaction.
-    Do not use this during transaction execution.
+def mark_visited(ctx: ContractContext, ex: Exec) -> bool:
     """
-    return snapshot_state(ex, include_path=True).unwrap()
+    Marks the given state as visited. Returns False if it has already been visited.
+
+    States are first grouped by their quick id. The first state of each group is kept pending, and its state id is computed only when another state with the same quick id shows up.
+
+    Assumes Exec.path_slice() has been executed for the given state.
+    """
+    visited, visited_quick = ctx.visited, ctx.visited_quick
+    quick_id = _quick_state_id(ex)
+
+    if quick_id not in visited_quick:
+        visited_quick[quick_id] = ex
+        return True
+
+    # resolve the pending state with the same quick id, if any
+    if (pending_ex := visited_quick[quick_id]) is not None:
+        visited.add(pending_ex.state_id)
+        visited_quick[quick_id] = None
+
+    state_id = ex.state_id
+    if state_id in visited:
+        return False
+
+    visited.add(state_id)
+    return True
 
 
 def run_target_contract(
@@ -442,26 +525,41 @@ def run_target_contract(
     if not contract_name:
         raise ValueError(f"couldn't find the contract name for: {addr}")
 
-    contract_json = BuildOut().get_by_name(contract_name, filename)
-    abi = get_abi(contract_json)
-    method_identifiers = contract_json["methodIdentifiers"]
+    # the same target contracts are executed from every frontier state,
+    # so their functions are flattened once and cached in the contract context
+    target_key = (contract_name, filename)
+    if (target := ctx.target_functions.get(target_key)) is None:
+        contract_json = BuildOut().get_by_name(contract_name, filename)
+        abi = get_abi(contract_json)
+        functions = tuple(
+            (
+                FunctionInfo(
+                    contract_name, fun_sig.partition("(")[0], fun_sig, selector
+                ),
+                abi[fun_sig]["stateMutability"],
+            )
+            for fun_sig, selector in contract_json["methodIdentifiers"].items()
+        )
+        target = ctx.target_functions[target_key] = (abi, functions)
+    abi, functions = target
+
+    # name component of the symbols created for each function call
+    addr_str = id_str(addr)
 
     # iterate over each function in the target contract
-    for fun_sig, fun_selector in method_identifiers.items():
-        fun_name = fun_sig.split("(")[0]
-        fun_info = FunctionInfo(contract_name, fun_name, fun_sig, fun_selector)
+    for fun_info, state_mutability in functions:
+        fun_sig = fun_info.sig
 
         # skip if 'pure' or 'view' function that doesn't change the state
-        state_mutability = abi[fun_sig]["stateMutability"]
         if state_mutability in ["pure", "view"]:
             if args.debug:
-                print(f"Skipping {fun_name} ({state_mutability})")
+                print(f"Skipping {fun_info.name} ({state_mutability})")
             continue
 
+        solver = acquire_solver(ctx, args)
         try:
             # initialize symbolic execution environment
             sevm = SEVM(args, fun_info)
-            solver = mk_solver(args)
             path = Path(solver)
             path.extend_path(ex.path)
 
@@ -473,17 +571,17 @@ def run_target_contract(
 
             # create a symbolic tx.origin
             tx_origin = mk_addr(
-                f"tx_origin_{id_str(addr)}_{uid()}_{ex.new_symbol_id():>02}"
+                f"tx_origin_{addr_str}_{uid()}_{ex.new_symbol_id():>02}"
             )
 
             # create a symbolic msg.sender
             msg_sender = mk_addr(
-                f"msg_sender_{id_str(addr)}_{uid()}_{ex.new_symbol_id():>02}"
+                f"msg_sender_{addr_str}_{uid()}_{ex.new_symbol_id():>02}"
             )
 
             # create a symbolic msg.value
             msg_value = BitVec(
-                f"msg_value_{id_str(addr)}_{uid()}_{ex.new_symbol_id():>02}",
+                f"msg_value_{addr_str}_{uid()}_{ex.new_symbol_id():>02}",
                 BitVecSort256,
             )
 
@@ -508,7 +606,7 @@ def run_target_contract(
             continue
 
         finally:
-            reset(solver)
+            release_solver(ctx, args, solver)
 
 
 def _compute_frontier(ctx: ContractContext, depth: int) -> Iterator[Exec]:
@@ -536,24 +634,23 @@ def _compute_frontier(ctx: ContractContext, depth: int) -> Iterator[Exec]:
     next_exs = []
     frontier_states[depth] = next_exs
 
-    visited = ctx.visited
-
     panic_error_codes = ctx.args.panic_error_codes
 
     for idx, pre_ex in enumerate(curr_exs):
+        # every unique state is stored in exactly one of the frontiers
+        num_unique = sum(len(exs) for exs in frontier_states.values())
         progress_status.update(
             f"depth: {cyan(depth)} | "
             f"starting states: {cyan(len(curr_exs))} | "
-            f"unique states: {cyan(len(visited))} | "
+            f"unique states: {cyan(num_unique)} | "
             f"frontier states: {cyan(len(next_exs))} | "
             f"completed paths: {cyan(idx)} "
         )
 
-        for addr in pre_ex.code:
-            # skip the test contract
-            if eq(addr, FOUNDRY_TEST):
-                continue
+        # target contracts, excluding the test contract
+        target_addrs = [addr for addr in pre_ex.code if not eq(addr, FOUNDRY_TEST)]
 
+        for addr in target_addrs:
             # execute a target contract
             post_exs = run_target_contract(ctx, pre_ex, addr)
 
@@ -592,22 +689,21 @@ def _compute_frontier(ctx: ContractContext, depth: int) -> Iterator[Exec]:
                     # because this is a reverted state, we don't need to explore it further
                     continue
 
-                # skip if already visited
+                # skip if already visited, otherwise update visited set
+                # TODO: check path feasibility
                 post_ex.path_slice()
-                post_id = get_state_id(post_ex)
-                if post_id in visited:
+                if not mark_visited(ctx, post_ex):
                     continue
 
-                # update visited set
-                # TODO: check path feasibility
-                visited.add(post_id)
-
                 # update call sequences
                 post_ex.call_sequence = pre_ex.call_sequence + [subcall]
 
                 # update timestamp
                 timestamp_name = f"halmos_block_timestamp_depth{depth}_{uid()}"
                 post_ex.block.timestamp = ZeroExt(192, BitVec(timestamp_name, 64))
+                # note: this leaves the state id unchanged, even if mark_visited() computes it
+                # lazily later. the timestamp is not part of the snapshot, and only the sliced
+                # constraints are hashed, while new constraints are appended past their indices.
                 post_ex.path.append(post_ex.block.timestamp >= pre_ex.block.timestamp)
 
                 # update the frontier states cache and yield the new frontier state
@@ -647,9 +743,8 @@ def run_message(
     contract_ctx = ctx.contract_ctx
     for depth in range(ctx.max_call_depth + 1):
         for ex in get_frontier(contract_ctx, depth):
+            solver = acquire_solver(contract_ctx, args)
             try:
-                solver = mk_solver(args)
-
                 path = Path(solver)
                 path.extend_path(ex.path)
                 path.process_dyn_params(dyn_params)
@@ -658,7 +753,7 @@ def run_message(
 
             finally:
                 # reset any remaining solver states from the default context
-                reset(solver)
+                release_solver(contract_ctx, args, solver)
 
 
 def run_test(ctx: FunctionContext) -> TestResult:
@@ -701,9 +796,33 @@ def run_test(ctx: FunctionContext) -> TestResult:
     potential = 0
     stuck = []
 
+    # options checked for every path; config lookups may go through the parent configs,
+    # so they are resolved once here
+    trace_paths = args.verbose >= VERBOSITY_TRACE_PATHS
+    trace_cex = args.verbose >= VERBOSITY_TRACE_COUNTEREXAMPLE
+    print_potential = args.verbose >= 1
+    panic_error_codes = args.panic_error_codes
+    print_failed_states = args.print_failed_states
+    print_states = args.print_states
+    width = args.width
+
+    # solver result counts, updated by the solver callbacks
+    num_sat = 0
+    num_unknown = 0
+    num_completed = 0
+    num_lock = threading.Lock()
+
+    # set by the solver callbacks to wake up the progress display
+    query_completed = threading.Event()
+
     def solve_end_to_end_callback(future: Future):
         # beware: this function may be called from threads other than the main thread,
         # so we must be careful to avoid referencing any z3 objects / contexts
+        nonlocal num_sat, num_unknown, num_completed
+
+        with num_lock:
+            num_completed += 1
+        query_completed.set()
 
         if e := future.exception():
             if isinstance(e, ShutdownError):
@@ -730,6 +849,13 @@ def run_test(ctx: FunctionContext) -> TestResult:
         # keep track of the solver outputs, so that we can display PASS/FAIL/TIMEOUT/ERROR later
         ctx.solver_outputs.append(solver_output)
 
+        if result == sat:
+            with num_lock:
+                num_sat += 1
+        elif result == unknown:
+            with num_lock:
+                num_unknown += 1
+
         if result == unsat:
             if solver_output.unsat_core:
                 ctx.append_unsat_core(solver_output.unsat_core)
@@ -742,8 +868,8 @@ def run_test(ctx: FunctionContext) -> TestResult:
 
         # print counterexample trace
         path_id = solver_output.path_id
-        if args.verbose >= VERBOSITY_TRACE_COUNTEREXAMPLE:
-            pid_str = f" #{path_id}" if args.verbose >= VERBOSITY_TRACE_PATHS else ""
+        if trace_cex:
+            pid_str = f" #{path_id}" if trace_paths else ""
             print(f"Trace{pid_str}:")
             print(ctx.traces[path_id], end="")
 
@@ -770,20 +896,26 @@ def run_test(ctx: FunctionContext) -> TestResult:
     # (actually triggers path exploration)
     #
 
+    def is_early_exit_triggered() -> bool:
+        if not ctx.solving_ctx.executor.is_shutdown():
+            return False
+
+        if args.debug:
+            print("aborting path exploration, executor has been shutdown")
+        return True
+
     path_id = 0  # default value in case we don't enter the loop body
-    submitted_futures = []
+    num_submitted = 0
     for path_id, ex in enumerate(exs):
         # check if early exit is triggered
-        if ctx.solving_ctx.executor.is_shutdown():
-            if args.debug:
-                print("aborting path exploration, executor has been shutdown")
+        if is_early_exit_triggered():
             break
 
         # cache exec in case we need to print it later
-        if args.print_failed_states:
+        if print_failed_states:
             ctx.exec_cache[path_id] = ex
 
-        if args.verbose >= VERBOSITY_TRACE_PATHS:
+        if trace_paths:
             print(f"Path #{path_id}:")
             print(indent_text(hexify(ex.path)))
 
@@ -792,12 +924,12 @@ def run_test(ctx: FunctionContext) -> TestResult:
 
         output = ex.context.output
         error_output = output.error
-        panic_found = ex.is_panic_of(args.panic_error_codes)
+        panic_found = ex.is_panic_of(panic_error_codes)
 
         if panic_found or (fail_found := is_global_fail_set(ex.context)):
             potential += 1
 
-            if args.verbose >= 1:
+            if print_potential:
                 print(f"Found potential path with {path_id=} ", end="")
                 if panic_found:
                     panic_code = unbox_int(output.data[4:36].unwrap())
@@ -808,10 +940,15 @@ def run_test(ctx: FunctionContext) -> TestResult:
             # we don't know yet if this will lead to a counterexample
             # so we save the rendered trace here and potentially print it later
             # if a valid counterexample is found
-            if args.verbose >= VERBOSITY_TRACE_COUNTEREXAMPLE:
+            if trace_cex:
                 ctx.traces[path_id] = rendered_trace(ex.context)
             ctx.call_sequences[path_id] = rendered_call_sequence(ex.call_sequence)
 
+            # the query must be serialized here, as z3 objects can't be passed to solver threads.
+            # skip it if early exit has been triggered in the meantime
+            if is_early_exit_triggered():
+                break
+
             query: SMTQuery = ex.path.to_smt2(args)
 
             # beware: because this object crosses thread boundaries, we must be careful to
@@ -826,7 +963,7 @@ def run_test(ctx: FunctionContext) -> TestResult:
             try:
                 solve_future = ctx.thread_pool.submit(solve_end_to_end, path_ctx)
                 solve_future.add_done_callback(solve_end_to_end_callback)
-                submitted_futures.append(solve_future)
+                num_submitted += 1
             except ShutdownError:
                 if args.debug:
                     print("aborting path exploration, executor has been shutdown")
@@ -855,14 +992,14 @@ def run_test(ctx: FunctionContext) -> TestResult:
             normal += 1
 
         # print post-states
-        if args.print_states:
+        if print_states:
             print(f"# {path_id}")
             print(ex)
 
         # 0 width is unlimited
-        if args.width and path_id >= args.width:
+        if width and path_id >= width:
             msg = "incomplete execution due to the specified limit"
-            warn(f"{funsig}: {msg}: --width {args.width}")
+            warn(f"{funsig}: {msg}: --width {width}")
             break
 
     num_execs = path_id + 1
@@ -883,14 +1020,17 @@ def run_test(ctx: FunctionContext) -> TestResult:
 
     if not args.no_status:
         while True:
-            done = sum(fm.done() for fm in submitted_futures)
-            total = potential
-            if done == total:
+            query_completed.clear()
+            if (done := num_completed) >= num_submitted:
                 break
             elapsed = timedelta(seconds=int(timer.elapsed()))
-            progress_status.update(f"[{elapsed}] solving queries: {done} / {total}")
-            time.sleep(0.1)
+            progress_status.update(
+                f"[{elapsed}] solving queries: {done} / {num_submitted}"
+            )
+            # wake up on completion, or periodically to refresh the elapsed time
+            query_completed.wait(timeout=0.25)
 
+    # wait for all the submitted queries, including their callbacks
     ctx.thread_pool.shutdown(wait=True)
 
     timer.stop()
@@ -900,11 +1040,10 @@ def run_test(ctx: FunctionContext) -> TestResult:
     # print test result
     #
 
-    counter = Counter(str(m.result) for m in ctx.solver_outputs)
-    if counter["sat"] > 0:
+    if num_sat > 0:
         passfail = red("[FAIL]")
         exitcode = Exitcode.COUNTEREXAMPLE.value
-    elif counter["unknown"] > 0:
+    elif num_unknown > 0:
         passfail = yellow("[TIMEOUT]")
         exitcode = Exitcode.TIMEOUT.value
     elif len(stuck) > 0:
@@ -962,19 +1101,20 @@ def run_test(ctx: FunctionContext) -> TestResult:
 
 def extract_setup(ctx: ContractContext) -> FunctionInfo:
     methodIdentifiers = ctx.method_identifiers
-    setup_sigs = sorted(
-        [
+    last_setup = max(
+        (
             (k, v)
             for k, v in methodIdentifiers.items()
             if k == "setUp()" or k.startswith("setUpSymbolic(")
-        ]
+        ),
+        default=None,
     )
 
-    if not setup_sigs:
+    if last_setup is None:
         return FunctionInfo()
 
-    (setup_sig, setup_selector) = setup_sigs[-1]
-    setup_name = setup_sig.split("(")[0]
+    (setup_sig, setup_selector) = last_setup
+    setup_name = setup_sig.partition("(")[0]
     return FunctionInfo(ctx.name, setup_name, setup_sig, setup_selector)
 
 
@@ -983,7 +1123,11 @@ def reset(solver):
         # can't access z3 objects from other threads
         warn("reset() called from a non-main thread")
 
-    solver.reset()
+    # roll back to an empty base scope, which is much cheaper than solver.reset()
+    # the base scope is opened by mk_solver()
+    assert solver.num_scopes() >= 1, "solver has no base scope; use mk_solver()"
+    solver.pop(solver.num_scopes())
+    solver.push()
 
 
 def run_contract(ctx: ContractContext) -> list[TestResult]:
@@ -1017,7 +1161,7 @@ def run_contract(ctx: ContractContext) -> list[TestResult]:
 
     # initialize the frontier and visited states using the initial setup state
     ctx.frontier_states[0] = [setup_ex]
-    ctx.visited.add(get_state_id(setup_ex))
+    mark_visited(ctx, setup_ex)
 
     test_results = run_tests(ctx, setup_ex, ctx.funsigs)
 
@@ -1051,7 +1195,7 @@ def run_tests(
 
     for funsig in funsigs:
         selector = ctx.method_identifiers[funsig]
-        fun_info = FunctionInfo(ctx.name, funsig.split("(")[0], funsig, selector)
+        fun_info = FunctionInfo(ctx.name, funsig.partition("(")[0], funsig, selector)
         try:
             test_config = with_devdoc(args, funsig, ctx.contract_json)
             if debug_config:
@@ -1106,14 +1250,41 @@ class MainResult:
     test_results: dict[str, list[TestResult]] = None
 
 
+class DataclassEncoder(json.JSONEncoder):
+    """
+    Encodes dataclasses field by field as they are reached,
+    without building a deep copy of the whole result first as asdict() does.
+    """
+
+    def default(self, o):
+        if is_dataclass(o) and not isinstance(o, type):
+            return {f.name: getattr(o, f.name) for f in fields(o)}
+        return super().default(o)
+
+
+def run_build(build_cmd: list[str], quiet: bool = False) -> int:
+    """
+    Runs the build command and returns its exit code.
+
+    If quiet is set, the build output is captured, and only shown if the build fails.
+    """
+    if not quiet:
+        # run forge without capturing stdout/stderr
+        return subprocess.run(build_cmd).returncode
+
+    # capture raw bytes, as forge output may not be decodable with the locale encoding
+    build_proc = subprocess.run(build_cmd, capture_output=True)
+    if build_proc.returncode:
+        print(build_proc.stdout.decode(errors="replace"), end="")
+        print(build_proc.stderr.decode(errors="replace"), end="", file=sys.stderr)
+
+    return build_proc.returncode
+
+
 def _main(_args=None) -> MainResult:
     timer = NamedTimer("total")
     timer.create_subtimer("build")
 
-    # clear any remaining live display before starting a new instance
-    rich.get_console().clear_live()
-    progress_status.start()
-
     #
     # z3 global options
     #
@@ -1132,6 +1303,10 @@ def _main(_args=None) -> MainResult:
         print(f"halmos {metadata.version('halmos')}")
         return MainResult(0)
 
+    # clear any remaining live display before starting a new instance
+    rich.get_console().clear_live()
+    progress_status.start()
+
     if args.disable_gc:
         gc.disable()
 
@@ -1159,10 +1334,11 @@ def _main(_args=None) -> MainResult:
         "metadata",
     ]
 
-    # run forge without capturing stdout/stderr
     debug(f"Running {' '.join(build_cmd)}")
 
-    build_exitcode = subprocess.run(build_cmd).returncode
+    build_exitcode = run_build(
+        build_cmd, quiet=args.quiet_build or bool(args.json_output)
+    )
 
     if build_exitcode:
         error(f"Build failed: {build_cmd}")
@@ -1197,8 +1373,8 @@ def _main(_args=None) -> MainResult:
 
         if args.json_output:
             debug(f"Writing output to {args.json_output}")
-            with open(args.json_output, "w") as json_file:
-                json.dump(asdict(result), json_file, indent=4)
+            with open(args.json_output, "w", buffering=1 << 20) as json_file:
+                json.dump(result, json_file, indent=4, cls=DataclassEncoder)
 
         return result
 
@@ -1218,16 +1394,35 @@ def _main(_args=None) -> MainResult:
     _contract_regex = contract_regex(args)
     _test_regex = test_regex(args)
 
-    for build_out_map, filename, contract_name in build_output_iterator(build_out):
-        if not re.search(_contract_regex, contract_name):
-            continue
+    # compiled once, as they are matched against every contract and function name
+    _contract_pat = re.compile(_contract_regex)
+    _test_pat = re.compile(_test_regex)
+
+    # without --match-test, a literal --function prefix needs no regex matching
+    if not args.match_test and re.escape(args.function) == args.function:
+        _test_prefix = args.function
+
+        def test_filter(funsig: str) -> bool:
+            return funsig.startswith(_test_prefix)
+
+    else:
+        test_filter = _test_pat.search
 
+    # every test contract is deployed at the same address
+    deploy_mapper = DeployAddressMapper()
+    foundry_test_hex = hexify(FOUNDRY_TEST)
+
+    for build_out_map, filename, contract_name in build_output_iterator(build_out):
+        # skip libraries, interfaces, and abstract contracts before matching the name
         (contract_json, contract_type, natspec) = build_out_map[filename][contract_name]
         if contract_type != "contract":
             continue
 
+        if not _contract_pat.search(contract_name):
+            continue
+
         methodIdentifiers = contract_json["methodIdentifiers"]
-        funsigs = [f for f in methodIdentifiers if re.search(_test_regex, f)]
+        funsigs = list(filter(test_filter, methodIdentifiers))
         num_found = len(funsigs)
 
         if num_found == 0:
@@ -1245,7 +1440,7 @@ def _main(_args=None) -> MainResult:
         print(f"\nRunning {num_found} tests for {contract_path}")
 
         # Set the test contract address in DeployAddressMapper
-        DeployAddressMapper().add_deployed_contract(hexify(FOUNDRY_TEST), contract_name)
+        deploy_mapper.add_deployed_contract(foundry_test_hex, contract_name)
 
         # support for `/// @custom:halmos` annotations
         contract_args = with_natspec(args, contract_name, natspec)
@@ -1263,7 +1458,7 @@ def _main(_args=None) -> MainResult:
         )
 
         test_results = run_contract(contract_ctx)
-        num_passed = sum(r.exitcode == PASS for r in test_results)
+        num_passed = countOf((r.exitcode for r in test_results), PASS)
         num_failed = num_found - num_passed
 
         print(
@@ -1277,11 +1472,9 @@ def _main(_args=None) -> MainResult:
         total_passed += num_passed
         total_failed += num_failed
 
-        if contract_path in test_results_map:
+        if test_results_map.setdefault(contract_path, test_results) is not test_results:
             raise ValueError("already exists", contract_path)
 
-        test_results_map[contract_path] = test_results
-
     if args.statistics:
         print(f"\n[time] {timer.report()}")
 
@@ -1301,8 +1494,8 @@ def _main(_args=None) -> MainResult:
     if total_found == 0:
         error(
             "No tests with"
-            + f" --match-contract '{contract_regex(args)}'"
-            + f" --match-test '{test_regex(args)}'"
+            + f" --match-contract '{_contract_regex}'"
+            + f" --match-test '{_test_regex}'"
         )
         return MainResult(1)
 
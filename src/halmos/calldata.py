@@ -168,7 +168,12 @@ class Calldata:
 
         # list of parameter types
         fun_abi = abi[fun_info.sig]
-        tuple_type = parse_tuple_type("", fun_abi["inputs"])
+        tuple_type = fun_abi.get("tuple_type")
+
+        # parse and memoize parameter types, as calldata may be created many times for the same function
+        if tuple_type is None:
+            tuple_type = parse_tuple_type("", fun_abi["inputs"])
+            fun_abi["tuple_type"] = tuple_type
 
         # no parameters
         if not tuple_type.items:
@@ -5,7 +5,7 @@ import re
 from dataclasses import dataclass
 from subprocess import PIPE, Popen
 
-from xxhash import xxh3_64, xxh3_64_digest
+from xxhash import xxh3_64_digest
 from z3 import (
     ULT,
     And,
@@ -256,31 +256,40 @@ def snapshot_state(
     # balance
     balance_hash = xxh3_64_digest(int.to_bytes(ex.balance.get_id(), length=32))
 
+    # each component is hashed in one shot over the concatenation of its fields,
+    # which is equivalent to (but cheaper than) feeding the fields one by one
+
     # code
-    m = xxh3_64()
     # note: iteration order is guaranteed to be the insertion order
-    for addr, code in ex.code.items():
-        m.update(int.to_bytes(int_of(addr), length=32))
-        # simply the object address is used, as code remains unchanged after deployment
-        m.update(int.to_bytes(id(code), length=32))
-    code_hash = m.digest()
+    code_hash = xxh3_64_digest(
+        b"".join(
+            int.to_bytes(int_of(addr), length=32)
+            # simply the object address is used, as code remains unchanged after deployment
+            + int.to_bytes(id(code), length=32)
+            for addr, code in ex.code.items()
+        )
+    )
 
     # storage
-    m = xxh3_64()
-    for addr, storage in ex.storage.items():
-        m.update(int.to_bytes(int_of(addr), length=32))
-        m.update(storage.digest())
-    storage_hash = m.digest()
+    storage_hash = xxh3_64_digest(
+        b"".join(
+            int.to_bytes(int_of(addr), length=32) + storage.digest()
+            for addr, storage in ex.storage.items()
+        )
+    )
 
     # path
-    m = xxh3_64()
+    path_data = b""
     if include_path:
-        if ex.path.sliced is None:
+        sliced = ex.path.sliced
+        if sliced is None:
             raise ValueError("path not yet sliced")
-        for idx, cond in enumerate(ex.path.conditions):
-            if idx in ex.path.sliced:
-                m.update(int.to_bytes(cond.get_id(), length=32))
-    path_hash = m.digest()
+        # visit only the sliced constraints, in the order of their indices
+        conds = list(ex.path.conditions)
+        path_data = b"".join(
+            int.to_bytes(conds[idx].get_id(), length=32) for idx in sorted(sliced)
+        )
+    path_hash = xxh3_64_digest(path_data)
 
     return ByteVec(balance_hash + code_hash + storage_hash + path_hash)
 
@@ -3,12 +3,12 @@ import os
 import re
 import sys
 from collections import OrderedDict
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Set, Sized
 from dataclasses import MISSING, dataclass, fields
 from dataclasses import field as dataclass_field
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 import toml
 
@@ -84,7 +84,10 @@ def arg(
     )
 
 
-def ensure_non_empty(values: list | set | dict) -> list:
+SizedT = TypeVar("SizedT", bound=Sized)
+
+
+def ensure_non_empty(values: SizedT) -> SizedT:
     if not values:
         raise ValueError("required a non-empty list")
     return values
@@ -134,17 +137,17 @@ class ParseErrorCodes(argparse.Action):
         setattr(namespace, self.dest, values)
 
     @staticmethod
-    def parse(values: str) -> set[int]:
+    def parse(values: str) -> frozenset[int]:
         values = values.strip()
         # return empty set, which will be interpreted as matching any value in Exec.reverted_with_panic()
         if values == "*":
-            return set()
+            return frozenset()
 
         # support multiple bases: decimal, hex, etc.
-        return ensure_non_empty(set(int(x, 0) for x in parse_csv(values)))
+        return ensure_non_empty(frozenset(int(x, 0) for x in parse_csv(values)))
 
     @staticmethod
-    def unparse(values: set[int]) -> str:
+    def unparse(values: Set[int]) -> str:
         if not values:
             return "*"
         return ",".join([f"0x{v:02x}" for v in values])
@@ -477,6 +480,12 @@ class Config:
         group=build,
     )
 
+    quiet_build: bool = arg(
+        help="hide forge build output unless the build fails (implied by --json-output)",
+        global_default=False,
+        group=build,
+    )
+
     ### Solver options
 
     smt_exp_by_const: int = arg(
@@ -3,11 +3,11 @@
 import itertools
 import re
 from collections import Counter, defaultdict
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterator, Set
 from copy import deepcopy
 from dataclasses import dataclass, field
 from datetime import timedelta
-from functools import reduce
+from functools import cached_property, reduce
 from timeit import default_timer as timer
 from typing import (
     Any,
@@ -59,7 +59,7 @@ from .bitvec import HalmosBitVec as BV
 from .bitvec import HalmosBool as Bool
 from .bytevec import ByteVec, ConcreteChunk, SymbolicChunk
 from .calldata import FunctionInfo
-from .cheatcodes import Prank, halmos_cheat_code, hevm_cheat_code
+from .cheatcodes import Prank, halmos_cheat_code, hevm_cheat_code, snapshot_state
 from .config import Config as HalmosConfig
 from .console import console
 from .constants import MAX_MEMORY_SIZE
@@ -1099,6 +1099,8 @@ class Path:
     term_to_vars: dict
     # constraints related to state variables
     sliced: set[int]
+    # cache for to_smt2(): (cond, tracked) -> (declarations, assertion)
+    smt2_cache: dict
 
     def __init__(self, solver: Solver):
         self.solver = solver
@@ -1111,6 +1113,7 @@ class Path:
         self.var_to_conds = defaultdict(set)
         self.term_to_vars = {}
         self.sliced = None
+        self.smt2_cache = {}
 
     def _get_related(self, var_set) -> set[int]:
         conds = set()
@@ -1171,25 +1174,80 @@ class Path:
         #       sexpr()-generated SMTLIB queries are often less efficient to solve than to_smt2().
         #
         # TODO: leverage more efficient serialization by representing constraints in pickle-friendly objects, instead of Z3 objects.
+        #
+        # Each condition is serialized separately, and the result is memoized in smt2_cache,
+        # which is shared by all paths branched from the same solver. Since those paths share
+        # a common prefix of conditions, only the conditions added after the branching point
+        # need to be serialized for each path. The query is then assembled from the union of
+        # the declarations, followed by the assertions in order.
 
         ids = [str(cond.get_id()) for cond in self.conditions]
 
+        tracked = args.cache_solver
+        cache = self.smt2_cache
+
         # TODO: investigate whether a separate context is necessary here
-        tmp_solver = create_solver(ctx=Context())
-        for cond in self.conditions:
-            cond_copied = cond.translate(tmp_solver.ctx)
-            if args.cache_solver:
-                tmp_solver.assert_and_track(cond_copied, str(cond.get_id()))
-            else:
-                tmp_solver.add(cond_copied)
+        tmp_solver = None
+
         # NOTE: Do not use self.solver.to_smt2() even if args.cache_solver is unset, as self.solver may not include all constraints from self.conditions.
-        query = tmp_solver.to_smt2()
-        tmp_solver.reset()
+        declarations = {}  # used as an ordered set
+        assertions = []
+        for cond in self.conditions:
+            key = (cond, tracked)
+            if (serialized := cache.get(key)) is None:
+                if tmp_solver is None:
+                    tmp_solver = create_solver(ctx=Context())
+                serialized = self.cond_to_smt2(tmp_solver, cond, tracked)
+                cache[key] = serialized
 
-        query = query.replace("(check-sat)", "")  # see __main__.solve()
+            decls, assertion = serialized
+            declarations.update(dict.fromkeys(decls))
+            assertions.append(assertion)
+
+        if tmp_solver is not None:
+            tmp_solver.reset()
+
+        query = "".join(declarations) + "".join(assertions)
 
         return SMTQuery(query, ids)
 
+    @staticmethod
+    def cond_to_smt2(
+        tmp_solver: Solver, cond: BoolRef, tracked: bool
+    ) -> tuple[tuple[str, ...], str]:
+        """
+        Serializes a single condition into its SMTLIB declarations and assertion.
+
+        The given solver is used as a scratch space, and is left unchanged on return.
+        """
+        tmp_solver.push()
+
+        cond_copied = cond.translate(tmp_solver.ctx)
+        if tracked:
+            tmp_solver.assert_and_track(cond_copied, str(cond.get_id()))
+        else:
+            tmp_solver.add(cond_copied)
+        smtlib = tmp_solver.to_smt2()
+
+        tmp_solver.pop()
+
+        # top-level commands start at the beginning of a line, e.g.:
+        #   ; benchmark generated from python API
+        #   (set-info :status unknown)
+        #   (declare-fun x () (_ BitVec 256))
+        #   (assert
+        #    (bvult x y))
+        #   (check-sat)
+        # the header and (check-sat) are dropped; see __main__.solve()
+        decls, assertion = [], ""
+        for command in re.split(r"\n(?=\S)", smtlib):
+            if command.startswith("(declare-"):
+                decls.append(f"{command}\n")
+            elif command.startswith("(assert"):
+                assertion += f"{command}\n"
+
+        return tuple(decls), assertion
+
     def check(self, cond):
         return self.solver.check(cond)
 
@@ -1228,6 +1286,8 @@ class Path:
         # shared across different paths
         path.term_to_vars = self.term_to_vars
         # path.sliced = None
+        # shared across paths with the same solver
+        path.smt2_cache = self.smt2_cache
 
         return path
 
@@ -1336,6 +1396,9 @@ class StorageData:
     def __contains__(self, key) -> bool:
         return key in self._mapping
 
+    def __len__(self) -> int:
+        return len(self._mapping)
+
     def digest(self) -> bytes:
         """
         Computes the xxh3_128 hash of the storage mapping.
@@ -1345,18 +1408,19 @@ class StorageData:
         Values, being Z3 objects, are encoded using their unique identifiers (get_id()) as 256-bit integers.
         For simplicity, all numbers are represented as 256-bit integers, regardless of their actual size.
         """
-        m = xxhash.xxh3_128()
+        data = []
         # TODO: consider sorting items to ensure the digest is independent of the order of storage updates.
         for key, val in self._mapping.items():
             if isinstance(key, int):  # GenericStorage
-                m.update(int.to_bytes(key, length=32))
+                data.append(int.to_bytes(key, length=32))
             else:  # SolidityStorage
                 for _k in key:
                     # The first key (slot) is of size 256 bits
-                    m.update(int.to_bytes(_k, length=32))
+                    data.append(int.to_bytes(_k, length=32))
 
-            m.update(int.to_bytes(val.get_id(), length=32))
-        return m.digest()
+            data.append(int.to_bytes(val.get_id(), length=32))
+        # hashing the concatenation at once is equivalent to feeding the chunks one by one
+        return xxhash.xxh3_128_digest(b"".join(data))
 
 
 class Exec:  # an execution path
@@ -1465,7 +1529,7 @@ class Exec:  # an execution path
     def is_halted(self) -> bool:
         return self.context.output.data is not None
 
-    def is_panic_of(self, expected_error_codes: set[int]) -> bool:
+    def is_panic_of(self, expected_error_codes: Set[int]) -> bool:
         """
         Check if the error is Panic(k) for any k in the given error code set.
         An empty set or None will match any error code.
@@ -1884,6 +1948,21 @@ class Exec:  # an execution path
 
         self.path.slice(var_set)
 
+    @cached_property
+    def state_id(self) -> int:
+        """
+        Computes the state snapshot hash, incorporating constraints on state variables.
+
+        The snapshot is condensed into a 128-bit integer, which is cheaper to store and compare in the visited set.
+        The result is memoized, so the snapshotted parts of the state (balance, code, storage, and sliced constraints) must not be modified afterwards.
+
+        Assumes constraints on state variables have been precomputed by running path_slice() after completing a transaction.
+        Do not use this during transaction execution.
+        """
+        return xxhash.xxh3_128_intdigest(
+            snapshot_state(self, include_path=True).unwrap()
+        )
+
     def try_resolve_contract_info(
         self, contract: Contract
     ) -> tuple[str | None, str | None]:
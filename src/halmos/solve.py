@@ -92,11 +92,24 @@ class ContractContext:
     frontier_states: dict[int, list[Exec]] = field(default_factory=dict)
 
     # set of visited state ids, to be updated during the invariant testing run
-    visited: set[bytes] = field(default_factory=set)
+    visited: set[int] = field(default_factory=set)
+
+    # map from quick state ids to the visited state whose state id is not yet computed
+    # (None if already added to `visited`); see mark_visited()
+    visited_quick: dict[int, Exec | None] = field(default_factory=dict)
 
     # the function info for the invariant test
     probes_reported: set[FunctionInfo] = field(default_factory=set)
 
+    # map from (contract name, filename) of target contracts to their abi and functions,
+    # where each function is given with its state mutability
+    target_functions: dict[
+        tuple[str, str | None], tuple[dict, tuple[tuple[FunctionInfo, str], ...]]
+    ] = field(default_factory=dict)
+
+    # released solvers for reuse, keyed by solver options; see acquire_solver()
+    solver_pool: dict[tuple[int, int], list[Solver]] = field(default_factory=dict)
+
 
 @dataclass(frozen=True)
 class SolvingContext:
@@ -467,8 +480,13 @@ def solve_end_to_end(ctx: PathContext) -> SolverOutput:
 
 def check_unsat_cores(query: SMTQuery, unsat_cores: list[list]) -> bool:
     # return true if the given query contains any given unsat core
+    if not unsat_cores:
+        return False
+
+    # this runs in solver threads, so avoid repeated linear scans of the assertion list
+    assertions = set(query.assertions)
     for unsat_core in unsat_cores:
-        if all(core in query.assertions for core in unsat_core):
+        if all(core in assertions for core in unsat_core):
             return True
     return False
 
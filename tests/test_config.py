@@ -65,6 +65,14 @@ def test_count_arg(config, parser):
     assert config_from_args.verbose == 6
 
 
+def test_quiet_build_arg(config, parser):
+    assert not config.quiet_build
+
+    args = parser.parse_args(["--quiet-build"])
+    config_from_args = config.with_overrides(source="command-line", **vars(args))
+    assert config_from_args.quiet_build
+
+
 def test_choice_arg(config, parser):
     # wrong choice raises
     with pytest.raises(SystemExit):
@@ -1,9 +1,10 @@
 import dataclasses
 import json
+import subprocess
 
 import pytest
 
-from halmos.__main__ import _main
+from halmos.__main__ import _main, run_build
 from halmos.bytevec import ByteVec
 from halmos.sevm import con
 from halmos.traces import rendered_calldata
@@ -66,6 +67,26 @@ def test_main_fail(cmd, halmos_options):
     assert actual["exitcode"] != 0
 
 
+@pytest.mark.parametrize("returncode", [0, 1])
+def test_run_build_quiet(monkeypatch, capsys, returncode):
+    # output that is not valid utf-8 must not crash the build step
+    stdout, stderr = b"compiling \xff\n", b"error \xfe\n"
+
+    def fake_run(cmd, **kwargs):
+        assert kwargs.get("capture_output")
+        return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    assert run_build(["forge", "build"], quiet=True) == returncode
+
+    out, err = capsys.readouterr()
+    if returncode:
+        assert out == "compiling \ufffd\n"
+        assert err == "error \ufffd\n"
+    else:
+        assert out == err == ""
+
+
 def assert_eq(m1: dict, m2: dict) -> int:
     assert list(m1.keys()) == list(m2.keys())
     for c in m1:
@@ -10,10 +10,20 @@ from z3 import (
     LShR,
     Select,
     SignExt,
+    Solver,
     ZeroExt,
+    sat,
+    unsat,
 )
 
-from halmos.__main__ import mk_block
+from halmos.__main__ import (
+    acquire_solver,
+    mark_visited,
+    mk_block,
+    mk_solver,
+    release_solver,
+    reset,
+)
 from halmos.bitvec import HalmosBitVec as BV
 from halmos.bytevec import ByteVec
 from halmos.exceptions import (
@@ -29,6 +39,7 @@ from halmos.sevm import (
     Exec,
     Message,
     Path,
+    StorageData,
     con,
     f_div,
     f_exp,
@@ -40,6 +51,7 @@ from halmos.sevm import (
     uint160,
     uint256,
 )
+from halmos.solve import ContractContext
 from halmos.utils import EVM
 
 caller = BitVec("msg_sender", 160)
@@ -504,3 +516,160 @@ def test_valid_jump(sevm, solver, storage):
     assert len(execs) == 1  # Only one valid path should execute
     assert execs[0].pc == 4  # PC should move to the stop
     assert execs[0].current_opcode() == EVM.STOP  # Should terminate cleanly
+
+
+def test_path_to_smt2_shares_prefix(args, solver):
+    path = Path(solver)
+    path.append(x.as_z3() != y.as_z3())
+    path.append(y.as_z3() != z.as_z3())
+
+    branch = path.branch(x.as_z3() == z.as_z3())
+    branch.activate()
+
+    query = branch.to_smt2(args)
+    assert query.smtlib.count("(declare-fun x ") == 1
+    assert query.smtlib.count("(assert") == 3
+    assert "(check-sat)" not in query.smtlib
+
+    # the conditions shared with the parent path are serialized only once
+    assert branch.smt2_cache is path.smt2_cache
+    assert len(path.smt2_cache) == 3
+    path.to_smt2(args)
+    assert len(path.smt2_cache) == 3
+
+
+@pytest.fixture
+def contract_ctx(args):
+    return ContractContext(
+        args=args,
+        name="TestContract",
+        funsigs=[],
+        creation_hexcode="",
+        deployed_hexcode="",
+        abi={},
+        method_identifiers={},
+        contract_json={},
+        libs={},
+        build_out_map={},
+    )
+
+
+# snapshots require concrete addresses
+visited_addr = con(0xAAAA0001, 160)
+
+# code objects are hashed by identity, as they are shared across states
+visited_code = Contract(BitVecVal(0x00, 8))
+
+
+def mk_sliced_ex(sevm, solver, slot_value: int) -> Exec:
+    storage = StorageData()
+    storage[0] = con(slot_value)
+    ex = mk_ex(BitVecVal(0x00, 8), sevm, solver, storage, caller, visited_addr)
+    ex.code = {visited_addr: visited_code}
+    ex.path_slice()
+    return ex
+
+
+def test_mark_visited_new_quick_id(contract_ctx, sevm, solver):
+    ex = mk_sliced_ex(sevm, solver, 1)
+
+    assert mark_visited(contract_ctx, ex)
+
+    # the state is kept pending, without computing its state id
+    assert list(contract_ctx.visited_quick.values()) == [ex]
+    assert not contract_ctx.visited
+    assert "state_id" not in ex.__dict__
+
+
+def test_mark_visited_same_state(contract_ctx, sevm, solver):
+    ex1 = mk_sliced_ex(sevm, solver, 1)
+    ex2 = mk_sliced_ex(sevm, solver, 1)
+
+    assert mark_visited(contract_ctx, ex1)
+    assert not mark_visited(contract_ctx, ex2)
+
+    # the pending state has been resolved on the collision
+    assert list(contract_ctx.visited_quick.values()) == [None]
+    assert contract_ctx.visited == {ex1.state_id}
+    assert ex1.state_id == ex2.state_id
+
+
+def test_mark_visited_distinct_states_same_quick_id(contract_ctx, sevm, solver):
+    ex1 = mk_sliced_ex(sevm, solver, 1)
+    ex2 = mk_sliced_ex(sevm, solver, 2)
+
+    assert mark_visited(contract_ctx, ex1)
+    assert mark_visited(contract_ctx, ex2)
+
+    # both states share a quick id, but are distinguished by their state ids
+    assert len(contract_ctx.visited_quick) == 1
+    assert contract_ctx.visited == {ex1.state_id, ex2.state_id}
+    assert ex1.state_id != ex2.state_id
+
+    # revisiting either state is detected
+    assert not mark_visited(contract_ctx, mk_sliced_ex(sevm, solver, 1))
+    assert not mark_visited(contract_ctx, mk_sliced_ex(sevm, solver, 2))
+
+
+def test_solver_pool_reuse(args, contract_ctx):
+    x = BitVec("x", 256)
+
+    solver = acquire_solver(contract_ctx, args)
+    path = Path(solver)
+    path.append(x > 1)
+    branch = path.branch(x == 1)
+    branch.activate()
+    assert solver.check() == unsat
+    release_solver(contract_ctx, args, solver)
+
+    # the released solver is handed out again, back at its base scope and without assertions
+    reused = acquire_solver(contract_ctx, args)
+    assert reused is solver
+    assert not reused.assertions()
+    assert reused.num_scopes() == 1
+
+    # branching and activation work on the reused solver
+    # (the last branch is activated first, as in the dfs path exploration)
+    path = Path(reused)
+    path.append(x < 10)
+    left = path.branch(x == 1)
+    right = path.branch(x == 20)
+    right.activate()
+    assert reused.check() == unsat
+    left.activate()
+    assert reused.check() == sat
+    release_solver(contract_ctx, args, reused)
+
+
+def test_solver_pool_capped(args, contract_ctx):
+    args = args.with_overrides(source="test", solver_threads=1)
+
+    solvers = [acquire_solver(contract_ctx, args) for _ in range(3)]
+    for solver in solvers:
+        release_solver(contract_ctx, args, solver)
+
+    [pool] = contract_ctx.solver_pool.values()
+    assert len(pool) == 1
+
+
+def test_reset_then_reuse(args):
+    x = BitVec("x", 256)
+
+    solver = mk_solver(args)
+    solver.add(x == 1)
+    solver.push()
+    solver.add(x == 2)
+    assert solver.check() == unsat
+
+    reset(solver)
+    assert not solver.assertions()
+    assert solver.num_scopes() == 1
+
+    solver.add(x == 2)
+    assert solver.check() == sat
+
+
+def test_reset_requires_base_scope():
+    # solvers not created by mk_solver() have no base scope to roll back to
+    with pytest.raises(AssertionError):
+        reset(Solver())